@@ -1,49 +1,18 @@
-import psycopg2
-import time
 import streamlit as st
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
-
-def connect_to_db(host, port, dbname, user, password):
-    """Connect to PostgreSQL database"""
-    return psycopg2.connect(
-        host=host,
-        port=port,
-        dbname=dbname,
-        user=user,
-        password=password
-    )
+
+from db import (
+    CREATE_TABLE, LIST_TABLES, drop_prepared_table, execute_prepared,
+    get_connection, run_batch, table_query
+)
 
 def create_test_table(table_name):
     """Create user-defined table on both master and slave"""
     try:
-        # Connect to master
-        master_conn = connect_to_db("localhost", 5432, "testdb", "postgres", "masterpass")
-        master_cur = master_conn.cursor()
-
-        # Create test table if it doesn't exist (with one column)
-        master_cur.execute(f"""
-            CREATE TABLE IF NOT EXISTS {table_name} (
-                id SERIAL PRIMARY KEY,
-                data TEXT
-            );
-        """)
-        master_conn.commit()
-
-        # Connect to slave
-        slave_conn = connect_to_db("localhost", 5433, "testdb", "postgres", "slavepass")
-        slave_cur = slave_conn.cursor()
+        # Create test table if it doesn't exist on master (with one column)
+        get_connection('master').cursor().execute(table_query(CREATE_TABLE, table_name))
 
         # Create test table if it doesn't exist on slave
-        slave_cur.execute(f"""
-            CREATE TABLE IF NOT EXISTS {table_name} (
-                id SERIAL PRIMARY KEY,
-                data TEXT
-            );
-        """)
-        slave_conn.commit()
-
-        slave_conn.close()
-        master_conn.close()
+        get_connection('slave').cursor().execute(table_query(CREATE_TABLE, table_name))
 
         return f"Test table '{table_name}' created on master and slave."
         
@@ -53,45 +22,23 @@ def create_test_table(table_name):
 def setup_replication():
     """Setup logical replication between master and slave"""
     try:
-        # Connect to master
-        master_conn = connect_to_db("localhost", 5432, "testdb", "postgres", "masterpass")
-        master_conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-        master_cur = master_conn.cursor()
-
-        # Drop publication if it exists on master
-        master_cur.execute("""
-            DO $$
-            BEGIN
-                IF EXISTS (SELECT 1 FROM pg_catalog.pg_publications WHERE pubname = 'master_pub') THEN
-                    DROP PUBLICATION master_pub;
-                END IF;
-            END
-            $$;
-        """)
+        # Recreate the publication on master in a single round trip
+        run_batch(get_connection('master'), [
+            ("DROP PUBLICATION IF EXISTS master_pub", None),
+            ("CREATE PUBLICATION master_pub FOR ALL TABLES", None),
+        ])
 
-        # Create publication on master
-        master_cur.execute("CREATE PUBLICATION master_pub FOR ALL TABLES;")
-        
-        # Connect to slave
-        slave_conn = connect_to_db("localhost", 5433, "testdb", "postgres", "slavepass")
-        slave_conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-        slave_cur = slave_conn.cursor()
+        # Subscription commands cannot run inside a transaction block, so they
+        # are sent to the slave one at a time
+        slave_cur = get_connection('slave').cursor()
 
         # Drop subscription if it exists on slave
-        slave_cur.execute("""
-            DO $$
-            BEGIN
-                IF EXISTS (SELECT 1 FROM pg_catalog.pg_subscription WHERE subname = 'slave_sub') THEN
-                    DROP SUBSCRIPTION slave_sub;
-                END IF;
-            END
-            $$;
-        """)
+        slave_cur.execute("DROP SUBSCRIPTION IF EXISTS slave_sub;")
 
         # Create subscription on slave
         slave_cur.execute("""
-            CREATE SUBSCRIPTION slave_sub 
-            CONNECTION 'host=localhost port=5432 dbname=testdb user=postgres password=masterpass' 
+            CREATE SUBSCRIPTION slave_sub
+            CONNECTION 'host=localhost port=5432 dbname=testdb user=postgres password=masterpass'
             PUBLICATION master_pub;
         """)
 
@@ -104,72 +51,67 @@ def get_tables():
     tables = {'master': [], 'slave': []}
 
     try:
-        # Connect to master
-        master_conn = connect_to_db("localhost", 5432, "testdb", "postgres", "masterpass")
-        master_cur = master_conn.cursor()
-        master_cur.execute("SELECT table_name FROM information_schema.tables WHERE table_schema = 'public';")
+        master_cur = get_connection('master').cursor()
+        master_cur.execute(LIST_TABLES)
         tables['master'] = [table[0] for table in master_cur.fetchall()]
 
-        # Connect to slave
-        slave_conn = connect_to_db("localhost", 5433, "testdb", "postgres", "slavepass")
-        slave_cur = slave_conn.cursor()
-        slave_cur.execute("SELECT table_name FROM information_schema.tables WHERE table_schema = 'public';")
+        slave_cur = get_connection('slave').cursor()
+        slave_cur.execute(LIST_TABLES)
         tables['slave'] = [table[0] for table in slave_cur.fetchall()]
 
-        master_conn.close()
-        slave_conn.close()
         return tables
     except Exception as e:
         return f"Error fetching tables: {e}"
 
+def add_row_to_table(table_name, data):
+    """Add a row to the specified table on both master and slave"""
+    try:
+        # Insert row into master
+        execute_prepared(get_connection('master'), table_name, 'insert_row', (data,))
+
+        # Insert row into slave
+        execute_prepared(get_connection('slave'), table_name, 'insert_row', (data,))
+
+        return f"Row with data '{data}' added to '{table_name}' on master and slave."
+    except Exception as e:
+        return f"Error adding row: {e}"
+
 def delete_row_from_table(table_name, row_id):
     """Delete a row from the specified table on both master and slave"""
     try:
-        # Connect to master
-        master_conn = connect_to_db("localhost", 5432, "testdb", "postgres", "masterpass")
-        master_cur = master_conn.cursor()
-
         # Delete row from master
-        master_cur.execute(f"DELETE FROM {table_name} WHERE id = %s;", (row_id,))
-        master_conn.commit()
-
-        # Connect to slave
-        slave_conn = connect_to_db("localhost", 5433, "testdb", "postgres", "slavepass")
-        slave_cur = slave_conn.cursor()
+        execute_prepared(get_connection('master'), table_name, 'delete_row', (row_id,))
 
         # Delete row from slave
-        slave_cur.execute(f"DELETE FROM {table_name} WHERE id = %s;", (row_id,))
-        slave_conn.commit()
+        execute_prepared(get_connection('slave'), table_name, 'delete_row', (row_id,))
 
-        master_conn.close()
-        slave_conn.close()
         return f"Row with ID {row_id} deleted from {table_name} on both master and slave."
     except Exception as e:
         return f"Error deleting row: {e}"
 
+def drop_table(table_name):
+    """Drop the user-defined table from both master and slave"""
+    try:
+        # Drop the table from master along with its prepared statements
+        drop_prepared_table(get_connection('master'), table_name)
+
+        # Drop the table from slave along with its prepared statements
+        drop_prepared_table(get_connection('slave'), table_name)
+
+        return f"Table '{table_name}' dropped from both master and slave."
+    except Exception as e:
+        return f"Error dropping table: {e}"
+
 def show_table_rows(table_name):
     """Fetch rows from the specified table"""
     rows = {'master': [], 'slave': []}
     
     try:
-        # Connect to master
-        master_conn = connect_to_db("localhost", 5432, "testdb", "postgres", "masterpass")
-        master_cur = master_conn.cursor()
-
         # Fetch data from the specified table in master
-        master_cur.execute(f"SELECT * FROM {table_name};")
-        rows['master'] = master_cur.fetchall()
-
-        # Connect to slave
-        slave_conn = connect_to_db("localhost", 5433, "testdb", "postgres", "slavepass")
-        slave_cur = slave_conn.cursor()
+        rows['master'] = execute_prepared(get_connection('master'), table_name, 'select_rows').fetchall()
 
         # Fetch data from the specified table in slave
-        slave_cur.execute(f"SELECT * FROM {table_name};")
-        rows['slave'] = slave_cur.fetchall()
-
-        master_conn.close()
-        slave_conn.close()
+        rows['slave'] = execute_prepared(get_connection('slave'), table_name, 'select_rows').fetchall()
 
         return rows
     except Exception as e:
@@ -0,0 +1,161 @@
+import string
+import threading
+
+import psycopg2
+from psycopg2 import errors, sql
+from psycopg2.extensions import connection
+
+# Connection settings for each node, as passed to connect_to_db
+NODES = {
+    'master': ("localhost", 5432, "testdb", "postgres", "masterpass"),
+    'slave': ("localhost", 5433, "testdb", "postgres", "slavepass"),
+}
+
+# Statements that are prepared per table; {table} is filled in as an identifier
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id SERIAL PRIMARY KEY,
+        data TEXT
+    )
+"""
+DROP_TABLE = "DROP TABLE IF EXISTS {table}"
+LIST_TABLES = "SELECT table_name FROM information_schema.tables WHERE table_schema = 'public';"
+
+ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+PREPARED_STATEMENTS = {
+    'insert_row': "INSERT INTO {table} (data) VALUES ($1)",
+    'select_rows': "SELECT * FROM {table}",
+    'delete_row': "DELETE FROM {table} WHERE id = $1",
+}
+
+class PreparedConnection(connection):
+    """psycopg2 connection that remembers its server-side prepared statements.
+
+    The connection is shared between Streamlit session threads, so the cache
+    is only read or changed while holding prepared_lock.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = {}
+        self.statement_count = 0
+        self.prepared_lock = threading.Lock()
+
+def connect_to_db(host, port, dbname, user, password):
+    """Connect to PostgreSQL database"""
+    return psycopg2.connect(
+        host=host,
+        port=port,
+        dbname=dbname,
+        user=user,
+        password=password,
+        connection_factory=PreparedConnection
+    )
+
+# Shared between Streamlit session threads, so guarded by _connections_lock
+_connections = {}
+_connections_lock = threading.Lock()
+
+def get_connection(node):
+    """Return the shared autocommit connection to 'master' or 'slave', reconnecting if needed"""
+    with _connections_lock:
+        conn = _connections.get(node)
+        if conn is None or conn.closed:
+            conn = connect_to_db(*NODES[node])
+            conn.autocommit = True
+            _connections[node] = conn
+        return conn
+
+def close_connections():
+    """Close the shared connections"""
+    with _connections_lock:
+        for conn in _connections.values():
+            if not conn.closed:
+                conn.close()
+        _connections.clear()
+
+def fold_table_name(table_name):
+    """Split a 'table' or 'schema.table' name and fold it the way an unquoted name is.
+
+    PostgreSQL only folds ASCII A-Z in unquoted names, so other letters are kept as typed.
+    """
+    parts = table_name.split('.')
+    if len(parts) > 2 or not all(parts):
+        raise ValueError(f"Invalid table name '{table_name}': expected 'table' or 'schema.table'")
+    return tuple(part.translate(ASCII_LOWER) for part in parts)
+
+def table_query(template, table_name):
+    """Compose a statement template with the (optionally schema-qualified) table name quoted"""
+    return sql.SQL(template).format(table=sql.Identifier(*fold_table_name(table_name)))
+
+def _prepare(conn, cur, table_name, operation):
+    """PREPARE a statement for table_name and cache its name; the caller holds prepared_lock"""
+    conn.statement_count += 1
+    name = f"stmt_{conn.statement_count}"
+    cur.execute(
+        sql.SQL("PREPARE {} AS ").format(sql.Identifier(name))
+        + table_query(PREPARED_STATEMENTS[operation], table_name)
+    )
+    conn.prepared[(fold_table_name(table_name), operation)] = name
+    return name
+
+def _execute(cur, name, params):
+    if params:
+        cur.execute(
+            sql.SQL("EXECUTE {} ({})").format(
+                sql.Identifier(name),
+                sql.SQL(", ").join(sql.Placeholder() * len(params))
+            ),
+            params
+        )
+    else:
+        cur.execute(sql.SQL("EXECUTE {}").format(sql.Identifier(name)))
+
+def execute_prepared(conn, table_name, operation, params=()):
+    """Run a prepared statement for table_name, preparing it on first use, and return the cursor"""
+    key = (fold_table_name(table_name), operation)
+    cur = conn.cursor()
+    with conn.prepared_lock:
+        name = conn.prepared.get(key) or _prepare(conn, cur, table_name, operation)
+
+    try:
+        _execute(cur, name, params)
+    except errors.InvalidSqlStatementName:
+        # The server no longer has the statement, so forget it and prepare it again
+        with conn.prepared_lock:
+            if conn.prepared.get(key) == name:
+                del conn.prepared[key]
+            name = conn.prepared.get(key) or _prepare(conn, cur, table_name, operation)
+        _execute(cur, name, params)
+    return cur
+
+def drop_prepared_table(conn, table_name):
+    """Drop table_name and deallocate its prepared statements in a single round trip.
+
+    PREPARE and DEALLOCATE are not transactional, so if the batch fails part way
+    some statements may already be gone. The cache entries are cleared either way;
+    any that survive on the server are left unused, since statements prepared
+    later always get a fresh name.
+    """
+    folded = fold_table_name(table_name)
+    with conn.prepared_lock:
+        keys = [key for key in conn.prepared if key[0] == folded]
+        statements = [(table_query(DROP_TABLE, table_name), None)]
+        for key in keys:
+            statements.append((sql.SQL("DEALLOCATE {}").format(sql.Identifier(conn.prepared[key])), None))
+        try:
+            run_batch(conn, statements)
+        finally:
+            for key in keys:
+                del conn.prepared[key]
+
+def run_batch(conn, statements):
+    """Send several (query, params) statements to the server in a single round trip.
+
+    On an autocommit connection the server runs them as one implicit transaction.
+    Only the result of the last statement can be fetched from the returned cursor.
+    """
+    cur = conn.cursor()
+    cur.execute(b";\n".join(cur.mogrify(query, params) for query, params in statements))
+    return cur
@@ -1,52 +1,23 @@
-import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 import time
 
-def connect_to_db(host, port, dbname, user, password):
-    """Connect to PostgreSQL database"""
-    return psycopg2.connect(
-        host=host,
-        port=port,
-        dbname=dbname,
-        user=user,
-        password=password
-    )
+from db import (
+    CREATE_TABLE, LIST_TABLES, close_connections, drop_prepared_table,
+    execute_prepared, get_connection, run_batch, table_query
+)
 
 def create_test_table(table_name):
     """Create user-defined table on both master and slave"""
     try:
-        # Connect to master
-        master_conn = connect_to_db("localhost", 5432, "testdb", "postgres", "masterpass")
-        master_cur = master_conn.cursor()
-
-        # Create test table if it doesn't exist (with one column)
-        master_cur.execute(f"""
-            CREATE TABLE IF NOT EXISTS {table_name} (
-                id SERIAL PRIMARY KEY,
-                data TEXT
-            );
-        """)
-        #master_cur.execute(f"INSERT INTO {table_name} (data) VALUES ('test data');")
-        master_conn.commit()
+        # Create test table if it doesn't exist on master (with one column)
+        master_conn = get_connection('master')
+        master_conn.cursor().execute(table_query(CREATE_TABLE, table_name))
 
         print(f"Test table '{table_name}' created on master.")
         print(f"Test table '{table_name}' replicated on slave.")
-        
-        # Connect to slave
-        slave_conn = connect_to_db("localhost", 5433, "testdb", "postgres", "slavepass")
-        slave_cur = slave_conn.cursor()
 
         # Create test table if it doesn't exist on slave
-        slave_cur.execute(f"""
-            CREATE TABLE IF NOT EXISTS {table_name} (
-                id SERIAL PRIMARY KEY,
-                data TEXT
-            );
-        """)
-        slave_conn.commit()
-
-        slave_conn.close()
-        master_conn.close()
+        slave_conn = get_connection('slave')
+        slave_conn.cursor().execute(table_query(CREATE_TABLE, table_name))
 
     except Exception as e:
         print(f"Error creating test table: {e}")
@@ -54,45 +25,25 @@ def create_test_table(table_name):
 def setup_replication():
     """Setup logical replication between master and slave"""
     try:
-        # Connect to master
-        master_conn = connect_to_db("localhost", 5432, "testdb", "postgres", "masterpass")
-        master_conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-        master_cur = master_conn.cursor()
-
-        # Drop publication if it exists on master
-        master_cur.execute("""
-            DO $$
-            BEGIN
-                IF EXISTS (SELECT 1 FROM pg_catalog.pg_publications WHERE pubname = 'master_pub') THEN
-                    DROP PUBLICATION master_pub;
-                END IF;
-            END
-            $$;
-        """)
-
-        # Create publication on master
-        master_cur.execute("CREATE PUBLICATION master_pub FOR ALL TABLES;")
-        
-        # Connect to slave
-        slave_conn = connect_to_db("localhost", 5433, "testdb", "postgres", "slavepass")
-        slave_conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        # Recreate the publication on master in a single round trip
+        master_conn = get_connection('master')
+        run_batch(master_conn, [
+            ("DROP PUBLICATION IF EXISTS master_pub", None),
+            ("CREATE PUBLICATION master_pub FOR ALL TABLES", None),
+        ])
+
+        # Subscription commands cannot run inside a transaction block, so they
+        # are sent to the slave one at a time
+        slave_conn = get_connection('slave')
         slave_cur = slave_conn.cursor()
 
         # Drop subscription if it exists on slave
-        slave_cur.execute("""
-            DO $$
-            BEGIN
-                IF EXISTS (SELECT 1 FROM pg_catalog.pg_subscription WHERE subname = 'slave_sub') THEN
-                    DROP SUBSCRIPTION slave_sub;
-                END IF;
-            END
-            $$;
-        """)
+        slave_cur.execute("DROP SUBSCRIPTION IF EXISTS slave_sub;")
 
         # Create subscription on slave
         slave_cur.execute("""
-            CREATE SUBSCRIPTION slave_sub 
-            CONNECTION 'host=postgres_master port=5432 dbname=testdb user=postgres password=masterpass' 
+            CREATE SUBSCRIPTION slave_sub
+            CONNECTION 'host=postgres_master port=5432 dbname=testdb user=postgres password=masterpass'
             PUBLICATION master_pub;
         """)
 
@@ -100,172 +51,101 @@ def setup_replication():
 
     except Exception as e:
         print(f"Error setting up replication: {e}")
-    finally:
-        if 'master_conn' in locals():
-            master_conn.close()
-        if 'slave_conn' in locals():
-            slave_conn.close()
 
 def test_replication(table_name):
     """Test replication by inserting data in master and checking slave"""
     try:
-        # Connect to master
-        master_conn = connect_to_db("localhost", 5432, "testdb", "postgres", "masterpass")
-        master_cur = master_conn.cursor()
-
-        # Create test table and insert data
-        master_cur.execute(f"INSERT INTO {table_name} (data) VALUES ('test data');")
-        master_conn.commit()
+        # Insert data on master
+        master_conn = get_connection('master')
+        execute_prepared(master_conn, table_name, 'insert_row', ('test data',))
 
         # Wait for replication
         time.sleep(2)
 
         # Check slave
-        slave_conn = connect_to_db("localhost", 5433, "testdb", "postgres", "slavepass")
-        slave_cur = slave_conn.cursor()
-        
-        slave_cur.execute(f"SELECT * FROM {table_name};")
-        results = slave_cur.fetchall()
-        
+        slave_conn = get_connection('slave')
+        results = execute_prepared(slave_conn, table_name, 'select_rows').fetchall()
+
         print(f"Data in slave: {results}")
 
         # List tables on both master and slave
-        master_cur.execute("SELECT table_name FROM information_schema.tables WHERE table_schema = 'public';")
+        master_cur = master_conn.cursor()
+        master_cur.execute(LIST_TABLES)
         master_tables = master_cur.fetchall()
         print(f"Tables on master: {master_tables}")
 
-        slave_cur.execute("SELECT table_name FROM information_schema.tables WHERE table_schema = 'public';")
+        slave_cur = slave_conn.cursor()
+        slave_cur.execute(LIST_TABLES)
         slave_tables = slave_cur.fetchall()
         print(f"Tables on slave: {slave_tables}")
 
     except Exception as e:
         print(f"Error testing replication: {e}")
-    finally:
-        if 'master_conn' in locals():
-            master_conn.close()
-        if 'slave_conn' in locals():
-            slave_conn.close()
 
 def drop_table(table_name):
     """Drop the user-defined table from both master and slave"""
     try:
-        # Connect to master
-        master_conn = connect_to_db("localhost", 5432, "testdb", "postgres", "masterpass")
-        master_cur = master_conn.cursor()
-
-        # Drop the table from master
-        master_cur.execute(f"DROP TABLE IF EXISTS {table_name};")
-        master_conn.commit()
-
-        # Connect to slave
-        slave_conn = connect_to_db("localhost", 5433, "testdb", "postgres", "slavepass")
-        slave_cur = slave_conn.cursor()
+        # Drop the table from master along with its prepared statements
+        drop_prepared_table(get_connection('master'), table_name)
 
-        # Drop the table from slave
-        slave_cur.execute(f"DROP TABLE IF EXISTS {table_name};")
-        slave_conn.commit()
+        # Drop the table from slave along with its prepared statements
+        drop_prepared_table(get_connection('slave'), table_name)
 
         print(f"Table '{table_name}' dropped from both master and slave.")
 
     except Exception as e:
         print(f"Error dropping table: {e}")
-    finally:
-        if 'master_conn' in locals():
-            master_conn.close()
-        if 'slave_conn' in locals():
-            slave_conn.close()
 
 def add_row_to_table(table_name, data):
     """Add a row to the specified table on both master and slave"""
     try:
-        # Connect to master
-        master_conn = connect_to_db("localhost", 5432, "testdb", "postgres", "masterpass")
-        master_cur = master_conn.cursor()
-
         # Insert row into master
-        master_cur.execute(f"INSERT INTO {table_name} (data) VALUES (%s);", (data,))
-        master_conn.commit()
-
-        # Connect to slave
-        slave_conn = connect_to_db("localhost", 5433, "testdb", "postgres", "slavepass")
-        slave_cur = slave_conn.cursor()
+        execute_prepared(get_connection('master'), table_name, 'insert_row', (data,))
 
         # Insert row into slave
-        slave_cur.execute(f"INSERT INTO {table_name} (data) VALUES (%s);", (data,))
-        slave_conn.commit()
+        execute_prepared(get_connection('slave'), table_name, 'insert_row', (data,))
 
         print(f"Row with data '{data}' added to '{table_name}' on master. and slave.")
         print(f"Row with data '{data}' replicated to slave.")
 
     except Exception as e:
         print(f"Error adding row: {e}")
-    finally:
-        if 'master_conn' in locals():
-            master_conn.close()
-        if 'slave_conn' in locals():
-            slave_conn.close()
 
 def show_data_in_tables():
     """Show data in both master and slave"""
     try:
-        # Connect to master
-        master_conn = connect_to_db("localhost", 5432, "testdb", "postgres", "masterpass")
-        master_cur = master_conn.cursor()
-
         # Fetch data from master
-        master_cur.execute("SELECT table_name FROM information_schema.tables WHERE table_schema = 'public';")
+        master_cur = get_connection('master').cursor()
+        master_cur.execute(LIST_TABLES)
         master_tables = master_cur.fetchall()
         print(f"Tables on master: {master_tables}")
 
-        # Connect to slave
-        slave_conn = connect_to_db("localhost", 5433, "testdb", "postgres", "slavepass")
-        slave_cur = slave_conn.cursor()
-
         # Fetch data from slave
-        slave_cur.execute("SELECT table_name FROM information_schema.tables WHERE table_schema = 'public';")
+        slave_cur = get_connection('slave').cursor()
+        slave_cur.execute(LIST_TABLES)
         slave_tables = slave_cur.fetchall()
         print(f"Tables on slave: {slave_tables}")
 
     except Exception as e:
         print(f"Error showing data: {e}")
-    finally:
-        if 'master_conn' in locals():
-            master_conn.close()
-        if 'slave_conn' in locals():
-            slave_conn.close()
 
 def show_table_rows(table_name):
     """Show rows from the specified table on both master and slave"""
     try:
-        # Connect to master
-        master_conn = connect_to_db("localhost", 5432, "testdb", "postgres", "masterpass")
-        master_cur = master_conn.cursor()
-
         # Fetch data from the specified table in master
-        master_cur.execute(f"SELECT * FROM {table_name};")
-        master_rows = master_cur.fetchall()
+        master_rows = execute_prepared(get_connection('master'), table_name, 'select_rows').fetchall()
         print(f"Data in '{table_name}' on master:")
         for row in master_rows:
             print(row)
 
-        # Connect to slave
-        slave_conn = connect_to_db("localhost", 5433, "testdb", "postgres", "slavepass")
-        slave_cur = slave_conn.cursor()
-
         # Fetch data from the specified table in slave
-        slave_cur.execute(f"SELECT * FROM {table_name};")
-        slave_rows = slave_cur.fetchall()
+        slave_rows = execute_prepared(get_connection('slave'), table_name, 'select_rows').fetchall()
         print(f"Data in '{table_name}' on slave:")
         for row in slave_rows:
             print(row)
 
     except Exception as e:
         print(f"Error showing rows: {e}")
-    finally:
-        if 'master_conn' in locals():
-            master_conn.close()
-        if 'slave_conn' in locals():
-            slave_conn.close()
 
 def menu():
     while True:
@@ -292,17 +172,15 @@ def menu():
             drop_table(table_name)
         elif choice == '5':
             # Show tables on both master and slave before asking for a table name
-            master_conn = connect_to_db("localhost", 5432, "testdb", "postgres", "masterpass")
-            master_cur = master_conn.cursor()
-            master_cur.execute("SELECT table_name FROM information_schema.tables WHERE table_schema = 'public';")
+            master_cur = get_connection('master').cursor()
+            master_cur.execute(LIST_TABLES)
             master_tables = master_cur.fetchall()
             print("Tables on master:")
             for table in master_tables:
                 print(table[0])
 
-            slave_conn = connect_to_db("localhost", 5433, "testdb", "postgres", "slavepass")
-            slave_cur = slave_conn.cursor()
-            slave_cur.execute("SELECT table_name FROM information_schema.tables WHERE table_schema = 'public';")
+            slave_cur = get_connection('slave').cursor()
+            slave_cur.execute(LIST_TABLES)
             slave_tables = slave_cur.fetchall()
             print("Tables on slave:")
             for table in slave_tables:
@@ -313,6 +191,7 @@ def menu():
             show_table_rows(table_name)
         elif choice == '6':
             print("Exiting...")
+            close_connections()
             break
         else:
             print("Invalid choice, please try again.")
@@ -0,0 +1,148 @@
+import math
+import threading
+import time
+from array import array
+
+from db import NODES, connect_to_db
+
+# Columns kept for every sample, in the order they are stored
+COLUMNS = (
+    "ts",                  # unix time the sample was taken
+    "wal_lsn_bytes",       # pg_current_wal_lsn() on master, as a byte offset
+    "replay_lag_s",        # worst replay_lag reported by pg_stat_replication
+    "replay_lag_bytes",    # worst gap between current WAL and replay_lsn
+    "retained_wal_bytes",  # WAL held back on master by the oldest replication slot
+    "received_lsn_bytes",  # received_lsn of the subscription on slave
+    "walsender_count",     # walsenders connected on master (rows in pg_stat_replication)
+    "sub_worker_count",    # apply workers running on slave (tablesync workers excluded)
+    "sub_msg_age_s",       # time since the subscription last heard from master
+)
+
+MASTER_STATS_QUERY = """
+    SELECT
+        pg_wal_lsn_diff(pg_current_wal_lsn(), '0/0')::float8,
+        (SELECT MAX(EXTRACT(EPOCH FROM replay_lag))::float8
+           FROM pg_stat_replication),
+        (SELECT MAX(pg_wal_lsn_diff(pg_current_wal_lsn(), replay_lsn))::float8
+           FROM pg_stat_replication),
+        (SELECT COALESCE(MAX(pg_wal_lsn_diff(pg_current_wal_lsn(), restart_lsn)), 0)::float8
+           FROM pg_replication_slots),
+        (SELECT count(*) FROM pg_stat_replication);
+"""
+
+SLAVE_STATS_QUERY = """
+    SELECT
+        MAX(pg_wal_lsn_diff(received_lsn, '0/0'))::float8,
+        count(pid) FILTER (WHERE relid IS NULL),
+        MAX(EXTRACT(EPOCH FROM (now() - last_msg_receipt_time)))::float8
+    FROM pg_stat_subscription;
+"""
+
+
+class RingBuffer:
+    """Fixed-size store of replication samples, one float array per column"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.columns = {name: array('d', [math.nan]) * capacity for name in COLUMNS}
+        self.head = 0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def append(self, sample):
+        """Store a sample (dict of column -> value), overwriting the oldest one when full"""
+        with self.lock:
+            for name, column in self.columns.items():
+                value = sample.get(name)
+                column[self.head] = math.nan if value is None else float(value)
+            self.head = (self.head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+
+    def snapshot(self):
+        """Return the stored samples in time order as a dict of column -> list"""
+        with self.lock:
+            start = (self.head - self.count) % self.capacity
+            if start + self.count <= self.capacity:
+                return {name: column[start:start + self.count].tolist()
+                        for name, column in self.columns.items()}
+            return {name: column[start:].tolist() + column[:self.head].tolist()
+                    for name, column in self.columns.items()}
+
+    def latest(self):
+        """Return the most recent sample as a dict, or None if nothing was stored yet"""
+        with self.lock:
+            if self.count == 0:
+                return None
+            index = (self.head - 1) % self.capacity
+            return {name: column[index] for name, column in self.columns.items()}
+
+
+class ReplicationSampler(threading.Thread):
+    """Background thread that polls replication statistics into a RingBuffer"""
+
+    def __init__(self, interval=2.0, capacity=1800):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.buffer = RingBuffer(capacity)
+        self.last_error = None
+        self._stop_event = threading.Event()
+        self._master_conn = None
+        self._slave_conn = None
+
+    def _connect(self):
+        """Open (or reopen) the autocommit connections used for sampling"""
+        if self._master_conn is None or self._master_conn.closed:
+            self._master_conn = connect_to_db(*NODES['master'])
+            self._master_conn.autocommit = True
+        if self._slave_conn is None or self._slave_conn.closed:
+            self._slave_conn = connect_to_db(*NODES['slave'])
+            self._slave_conn.autocommit = True
+
+    def _close(self):
+        for conn in (self._master_conn, self._slave_conn):
+            if conn is not None and not conn.closed:
+                conn.close()
+        self._master_conn = None
+        self._slave_conn = None
+
+    def sample(self):
+        """Take a single sample from master and slave and store it"""
+        self._connect()
+
+        master_cur = self._master_conn.cursor()
+        master_cur.execute(MASTER_STATS_QUERY)
+        wal_lsn, replay_lag_s, replay_lag_bytes, retained, walsenders = master_cur.fetchone()
+        master_cur.close()
+
+        slave_cur = self._slave_conn.cursor()
+        slave_cur.execute(SLAVE_STATS_QUERY)
+        received_lsn, sub_workers, msg_age = slave_cur.fetchone()
+        slave_cur.close()
+
+        self.buffer.append({
+            "ts": time.time(),
+            "wal_lsn_bytes": wal_lsn,
+            "replay_lag_s": replay_lag_s,
+            "replay_lag_bytes": replay_lag_bytes,
+            "retained_wal_bytes": retained,
+            "received_lsn_bytes": received_lsn,
+            "walsender_count": walsenders,
+            "sub_worker_count": sub_workers,
+            "sub_msg_age_s": msg_age,
+        })
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.sample()
+                self.last_error = None
+            except Exception as e:
+                # Drop the connections so the next round reconnects; any error
+                # is kept for the dashboard instead of killing the thread
+                self.last_error = f"Error sampling replication stats: {e}"
+                self._close()
+            self._stop_event.wait(self.interval)
+        self._close()
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,92 @@
+import time
+
+import pandas as pd
+import streamlit as st
+
+from monitor import ReplicationSampler
+
+@st.cache_resource
+def get_sampler(interval, capacity):
+    """Start one background sampler per Streamlit process"""
+    sampler = ReplicationSampler(interval=interval, capacity=capacity)
+    sampler.start()
+    return sampler
+
+def build_frame(samples):
+    """Turn a ring buffer snapshot into a time-indexed DataFrame with derived rates"""
+    df = pd.DataFrame(samples)
+    df["time"] = pd.to_datetime(df["ts"], unit="s")
+    df = df.set_index("time")
+
+    # Throughput is the LSN advance between consecutive samples
+    elapsed = df["ts"].diff()
+    df["master_wal_bytes_per_s"] = df["wal_lsn_bytes"].diff() / elapsed
+    df["slave_received_bytes_per_s"] = df["received_lsn_bytes"].diff() / elapsed
+    return df
+
+def show_alerts(latest, lag_limit_s, silence_limit_s, retained_limit_mb):
+    """Show threshold alerts for the most recent sample"""
+    ok = True
+    # With no walsender or subscription worker the lag columns are empty, so
+    # a missing stream has to be alerted on explicitly
+    if not latest["walsender_count"] > 0:
+        st.error("No walsender is connected on master: replication is not streaming")
+        ok = False
+    if not latest["sub_worker_count"] > 0:
+        st.error("No subscription apply worker is running on slave: changes are not being applied")
+        ok = False
+    if latest["replay_lag_s"] > lag_limit_s:
+        st.error(f"Replay lag is {latest['replay_lag_s']:.1f}s (limit {lag_limit_s}s)")
+        ok = False
+    if latest["sub_msg_age_s"] > silence_limit_s:
+        st.error(f"Slave last heard from master {latest['sub_msg_age_s']:.1f}s ago (limit {silence_limit_s}s)")
+        ok = False
+    retained_mb = latest["retained_wal_bytes"] / (1024 * 1024)
+    if retained_mb > retained_limit_mb:
+        st.warning(f"Replication slots retain {retained_mb:.1f} MB of WAL (limit {retained_limit_mb} MB)")
+        ok = False
+    if ok:
+        st.success("Replication lag and WAL retention are within limits")
+
+def dashboard():
+    """Live replication health dashboard"""
+    st.title("Replication Dashboard")
+
+    st.sidebar.title("Dashboard Options")
+    refresh_s = st.sidebar.number_input("Refresh every (s)", min_value=1, value=5)
+    lag_limit_s = st.sidebar.number_input("Lag alert threshold (s)", min_value=0.0, value=5.0)
+    # Idle walsenders only send keepalives every wal_sender_timeout / 2 (30s by default)
+    silence_limit_s = st.sidebar.number_input("Subscription silence alert threshold (s)", min_value=0.0, value=60.0)
+    retained_limit_mb = st.sidebar.number_input("Retained WAL alert threshold (MB)", min_value=0.0, value=512.0)
+
+    sampler = get_sampler(2.0, 1800)
+    if not sampler.is_alive():
+        st.error("The replication sampler has stopped: restart the app to resume sampling")
+    if sampler.last_error:
+        st.error(sampler.last_error)
+
+    latest = sampler.buffer.latest()
+    if latest is None:
+        st.info("Waiting for the first replication sample...")
+    else:
+        # Alerts on an old sample would report a health we cannot see any more
+        age_s = time.time() - latest["ts"]
+        if sampler.last_error or age_s > 3 * sampler.interval:
+            st.error(f"Replication data is stale: the last good sample is {age_s:.0f}s old")
+        else:
+            show_alerts(latest, lag_limit_s, silence_limit_s, retained_limit_mb)
+        df = build_frame(sampler.buffer.snapshot())
+
+        st.subheader("Replay lag / time since slave last heard from master (s)")
+        st.line_chart(df[["replay_lag_s", "sub_msg_age_s"]])
+
+        st.subheader("Throughput (bytes/s)")
+        st.line_chart(df[["master_wal_bytes_per_s", "slave_received_bytes_per_s"]])
+
+        st.subheader("WAL retained by slots / replay gap (bytes)")
+        st.line_chart(df[["retained_wal_bytes", "replay_lag_bytes"]])
+
+    time.sleep(refresh_s)
+    st.rerun()
+
+dashboard()